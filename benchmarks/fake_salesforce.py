@@ -0,0 +1,50 @@
+import re
+from time import sleep
+
+# A stand-in for simple_salesforce.Salesforce that serves Account snapshots
+# from memory, so fetch_accounts can run without credentials or a network.
+
+CURRENCY_PATTERN = re.compile(r"CurrencyIsoCode\s*=\s*'(\w+)'")
+
+
+class FakeSalesforce:
+    """
+    Only `sf.bulk.<Object>.query(query, lazy_operation=...)` is provided.
+    `records_by_currency` maps a CurrencyIsoCode to the records the query
+    returns for it; each lazy batch holds at most `batch_size` records and
+    waits `batch_latency` seconds before it is yielded.
+    """
+
+    def __init__(self, records_by_currency, batch_size=10000, batch_latency=0.0):
+        self.bulk = FakeBulkHandler(records_by_currency, batch_size, batch_latency)
+
+
+class FakeBulkHandler:
+    def __init__(self, records_by_currency, batch_size, batch_latency):
+        self.records_by_currency = records_by_currency
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+
+    def __getattr__(self, name):
+        return FakeBulkType(name, self)
+
+
+class FakeBulkType:
+    def __init__(self, object_name, handler):
+        self.object_name = object_name
+        self.handler = handler
+
+    def query(self, query, lazy_operation=False):
+        match = CURRENCY_PATTERN.search(query)
+        currency = match.group(1) if match else None
+        records = self.handler.records_by_currency.get(currency, [])
+        if lazy_operation:
+            return self._batches(records)
+        return list(records)
+
+    def _batches(self, records):
+        size = self.handler.batch_size
+        for start in range(0, len(records), size):
+            if self.handler.batch_latency:
+                sleep(self.handler.batch_latency)
+            yield records[start : start + size]
@@ -0,0 +1,385 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from time import strftime
+
+import pandas as pd
+
+from benchmarks.fake_salesforce import FakeSalesforce
+from benchmarks.synthetic import make_accounts, make_acquisition
+from instrumentation import RunMetrics
+from pipeline import (
+    build_output,
+    clean_results,
+    compare,
+    fetch_accounts,
+    flatten_accounts,
+    preprocess_acquisition,
+)
+
+# Scale points: Account snapshot size and acquisition file size.
+SCALE_POINTS = {
+    "1k": (1_000, 100),
+    "10k": (10_000, 100),
+    "100k": (100_000, 1_000),
+    "1m": (1_000_000, 10_000),
+}
+DEFAULT_SCALES = "1k,10k"
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+# Largest sheet openpyxl can write, header row included
+EXCEL_MAX_ROWS = 1_048_576
+CURRENCY = "USD"
+# Settings that change the data or the work done, so timings recorded with
+# different values are not comparable
+BASELINE_SETTINGS = [
+    "seed",
+    "duplicate_rate",
+    "noise",
+    "address_ratio",
+    "name_ratio",
+    "compare_pair_limit",
+    "batch_size",
+    "batch_latency",
+]
+
+
+def run_scale_point(
+    accounts_rows,
+    acquisition_rows,
+    duplicate_rate,
+    noise,
+    seed,
+    address_ratio,
+    name_ratio,
+    compare_pair_limit,
+    batch_size,
+    batch_latency,
+):
+    """
+    Run every pipeline stage once at one scale point and return its timings.
+    Meant to run in a fresh process so the peak RSS figures belong to it.
+    """
+    accounts = make_accounts(accounts_rows, seed=seed)
+    acquisition, _ = make_acquisition(
+        acquisition_rows, accounts, duplicate_rate, noise, seed=seed
+    )
+    sf = FakeSalesforce({CURRENCY: accounts}, batch_size, batch_latency)
+    metrics = RunMetrics()
+
+    with tempfile.TemporaryDirectory() as folder:
+        acquisition_path = os.path.join(folder, "acquisition.xlsx")
+        acquisition.to_excel(acquisition_path, index=False)
+        del acquisition
+
+        def write(name, df):
+            if len(df) + 1 > EXCEL_MAX_ROWS:
+                metrics.stages[name] = {
+                    "skipped": f"{len(df)} rows over the Excel sheet limit"
+                }
+                return
+            with metrics.stage(name, len(df)):
+                df.to_excel(os.path.join(folder, name + ".xlsx"), index=False)
+
+        with metrics.stage("read_acquisition") as stage:
+            acquisition_df = pd.read_excel(acquisition_path)
+            stage["rows_out"] = len(acquisition_df)
+        with metrics.stage("preprocess", len(acquisition_df)) as stage:
+            acquisition_df = preprocess_acquisition(acquisition_df)
+            stage["rows_out"] = len(acquisition_df)
+        write("write_processed_acquisition", acquisition_df)
+
+        with metrics.stage("fetch") as stage:
+            all_results = fetch_accounts(sf, CURRENCY)
+            stage["rows_out"] = len(all_results)
+        with metrics.stage("clean", len(all_results)) as stage:
+            cleaned = clean_results(all_results)
+            stage["rows_out"] = len(cleaned)
+        with metrics.stage("flatten", len(cleaned)) as stage:
+            salesforce_df = flatten_accounts(cleaned)
+            stage["rows_out"] = len(salesforce_df)
+        write("write_processed_salesforce", salesforce_df)
+
+        # Over the pair limit, score only the first acquisition rows that fit
+        # (at least one) so compare still has a data point at every scale
+        sample_rows = len(acquisition_df)
+        if sample_rows * len(salesforce_df) > compare_pair_limit:
+            sample_rows = max(1, compare_pair_limit // max(1, len(salesforce_df)))
+        with metrics.stage("compare", sample_rows) as stage:
+            stage["pairs"] = sample_rows * len(salesforce_df)
+            if sample_rows < len(acquisition_df):
+                stage["sampled_rows"] = sample_rows
+            final = compare(
+                acquisition_df.iloc[:sample_rows],
+                salesforce_df,
+                address_ratio,
+                name_ratio,
+            )
+            stage["rows_out"] = len(final)
+        write("write_matches", final)
+
+        with metrics.stage("output", len(acquisition_df)) as stage:
+            outputs = build_output(acquisition_df, final, CURRENCY, False, False)
+            stage["rows_out"] = len(outputs)
+            if sample_rows < len(acquisition_df):
+                # The match table only covers the sample, so this is not the
+                # work a real run would do
+                stage["not_comparable"] = "compare was sampled"
+        write("write_dataload", outputs)
+
+    return {
+        "accounts": accounts_rows,
+        "acquisition": acquisition_rows,
+        "salesforce_rows": len(salesforce_df),
+        "stages": metrics.stages,
+    }
+
+
+def best_of(runs):
+    """Keep the fastest time per stage across repeated runs."""
+    best = runs[0]
+    for run in runs[1:]:
+        for name, stage in run["stages"].items():
+            current = best["stages"].get(name, {})
+            fastest = current.get("seconds", float("inf"))
+            if stage.get("seconds", float("inf")) < fastest:
+                best["stages"][name] = stage
+    return best
+
+
+def settings_mismatch(args, baseline):
+    """
+    Return (setting, baseline value, current value) for every data or
+    threshold setting that differs from the one the baseline was run with.
+    """
+    recorded = baseline.get("meta", {}).get("args", {})
+    current = vars(args)
+    return [
+        (name, recorded.get(name), current[name])
+        for name in BASELINE_SETTINGS
+        if recorded.get(name) != current[name]
+    ]
+
+
+def _got_worse(before, after, tolerance, min_delta, higher_is_better=False):
+    if before is None or after is None:
+        return False
+    if higher_is_better:
+        return after < before * (1 - tolerance) and before - after > min_delta
+    return after > before * (1 + tolerance) and after - before > min_delta
+
+
+def compare_to_baseline(results, baseline, tolerance, min_delta, min_memory_delta):
+    """
+    Return one entry per stage and metric that got worse than the baseline
+    by more than `tolerance` (a fraction): slower `seconds`, lower
+    `pairs_per_sec`, or more memory (by more than `min_memory_delta` MB).
+    A stage that ran in one file but was skipped in the other is reported
+    too, as are stages whose timing is marked not comparable.
+    """
+    regressions = []
+    for scale, point in results["results"].items():
+        base_point = baseline.get("results", {}).get(scale)
+        if base_point is None:
+            continue
+        names = list(point["stages"])
+        names += [n for n in base_point["stages"] if n not in point["stages"]]
+        for name in names:
+            stage = point["stages"].get(name, {})
+            base_stage = base_point["stages"].get(name, {})
+            ran, base_ran = "seconds" in stage, "seconds" in base_stage
+            if ran != base_ran:
+                regressions.append(
+                    {
+                        "scale": scale,
+                        "stage": name,
+                        "metric": "ran",
+                        "baseline": "ran" if base_ran else "skipped",
+                        "current": "ran" if ran else "skipped",
+                    }
+                )
+                continue
+            if not ran:
+                continue
+            if "not_comparable" in stage or "not_comparable" in base_stage:
+                continue
+            checks = [
+                ("seconds", min_delta, False),
+                ("pairs_per_sec", 0, True),
+                ("process_peak_rss_mb", min_memory_delta, False),
+                ("rss_growth_mb", min_memory_delta, False),
+            ]
+            for metric, delta, higher_is_better in checks:
+                before, after = base_stage.get(metric), stage.get(metric)
+                if _got_worse(before, after, tolerance, delta, higher_is_better):
+                    regressions.append(
+                        {
+                            "scale": scale,
+                            "stage": name,
+                            "metric": metric,
+                            "baseline": before,
+                            "current": after,
+                        }
+                    )
+    return regressions
+
+
+def print_point(scale, point):
+    print(
+        f"\n== {scale}: {point['accounts']} accounts "
+        f"({point['salesforce_rows']} address rows), "
+        f"{point['acquisition']} acquisition rows"
+    )
+    for name, stage in point["stages"].items():
+        if "skipped" in stage:
+            print(f"  {name:<28} skipped ({stage['skipped']})")
+            continue
+        line = f"  {name:<28} {stage['seconds']:>10.3f}s"
+        if stage.get("pairs_per_sec"):
+            line += f"  {stage['pairs_per_sec']:>12,} pairs/s"
+        if stage.get("process_peak_rss_mb") is not None:
+            line += f"  process peak {stage['process_peak_rss_mb']:>8.1f} MB"
+        if "sampled_rows" in stage:
+            line += f"  (sampled {stage['sampled_rows']} rows)"
+        if "not_comparable" in stage:
+            line += f"  (not comparable: {stage['not_comparable']})"
+        print(line)
+
+
+def save_results(results, paths):
+    for path in paths:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time each stage of the duplicate check on synthetic data."
+    )
+    parser.add_argument(
+        "--scales",
+        default=DEFAULT_SCALES,
+        help=f"Comma separated scale points from {', '.join(SCALE_POINTS)}.",
+    )
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--address-ratio", type=int, default=80)
+    parser.add_argument("--name-ratio", type=int, default=80)
+    parser.add_argument(
+        "--compare-pair-limit",
+        type=int,
+        default=5_000_000,
+        help="Above this many pairs, compare only scores a sample of rows.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Records per batch served by the fake Bulk API.",
+    )
+    parser.add_argument(
+        "--batch-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the fake Bulk API waits before each batch.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="Results file to check for regressions.")
+    parser.add_argument("--save-baseline", help="Also write the results here.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta", type=float, default=0.05)
+    parser.add_argument(
+        "--min-memory-delta",
+        type=float,
+        default=20,
+        help="Ignore memory growth smaller than this many MB.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALE_POINTS]
+    if unknown:
+        print(f"Unknown scale points: {', '.join(unknown)}")
+        return 2
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatched = settings_mismatch(args, baseline)
+        if mismatched:
+            print("The baseline was recorded with different settings:")
+            for name, before, after in mismatched:
+                flag = "--" + name.replace("_", "-")
+                print(f"  {flag}: {before} in baseline, {after} now")
+            print("Re-run with the same settings or record a new baseline.")
+            return 2
+
+    results = {
+        "meta": {
+            "timestamp": strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "args": vars(args),
+        },
+        "results": {},
+    }
+    paths = [path for path in (args.output, args.save_baseline) if path]
+    context = multiprocessing.get_context("spawn")
+    for scale in scales:
+        accounts_rows, acquisition_rows = SCALE_POINTS[scale]
+        runs = []
+        for _ in range(args.repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                runs.append(
+                    pool.submit(
+                        run_scale_point,
+                        accounts_rows,
+                        acquisition_rows,
+                        args.duplicate_rate,
+                        args.noise,
+                        args.seed,
+                        args.address_ratio,
+                        args.name_ratio,
+                        args.compare_pair_limit,
+                        args.batch_size,
+                        args.batch_latency,
+                    ).result()
+                )
+        results["results"][scale] = best_of(runs)
+        print_point(scale, results["results"][scale])
+        # Save as we go so a failing larger scale keeps the finished ones
+        save_results(results, paths)
+
+    for path in paths:
+        print(f"\nResults written to {path}")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(
+            results, baseline, args.tolerance, args.min_delta, args.min_memory_delta
+        )
+        if regressions:
+            print("\nRegressions against baseline:")
+            for r in regressions:
+                print(
+                    f"  {r['scale']} {r['stage']} {r['metric']}: "
+                    f"{r['baseline']} -> {r['current']}"
+                )
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import random
+
+import pandas as pd
+
+from pipeline import ACQUISITION_COLUMNS, MAILING_COLUMNS, PRIMARY_COLUMNS
+
+# Synthetic acquisition files and Account snapshots for the benchmarks.
+# Everything is driven by a seeded random.Random so a given (size, seed)
+# always produces the same data.
+
+PROFILE_KEY = "DNBConnect__D_B_Connect_Company_Profile__r"
+
+NAME_WORDS = [
+    "Acme", "Apex", "Atlas", "Beacon", "Blue", "Cedar", "Crown", "Delta",
+    "Eagle", "Evergreen", "Falcon", "Frontier", "Global", "Granite", "Harbor",
+    "Horizon", "Iron", "Keystone", "Liberty", "Lone", "Maple", "Meridian",
+    "Northern", "Oak", "Omega", "Pacific", "Peak", "Pioneer", "Prime",
+    "Quantum", "Redwood", "River", "Summit", "Sterling", "Titan", "Union",
+    "Valley", "Vista", "Western", "Zenith",
+]
+INDUSTRY_WORDS = [
+    "Analytics", "Builders", "Chemicals", "Consulting", "Dental", "Electric",
+    "Energy", "Engineering", "Foods", "Freight", "Health", "Industrial",
+    "Labs", "Logistics", "Machining", "Manufacturing", "Medical", "Metals",
+    "Packaging", "Plastics", "Research", "Robotics", "Supply", "Systems",
+    "Technologies", "Tooling",
+]
+SUFFIXES = ["Inc", "LLC", "Corp", "Co", "Ltd", "Group", "Holdings", ""]
+SUFFIX_VARIANTS = {
+    "Inc": ["Inc.", "Incorporated"],
+    "LLC": ["L.L.C.", "LLC."],
+    "Corp": ["Corp.", "Corporation"],
+    "Co": ["Co.", "Company"],
+    "Ltd": ["Ltd.", "Limited"],
+    "Group": ["Grp"],
+    "Holdings": ["Hldgs"],
+}
+STREET_NAMES = [
+    "Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake",
+    "Hill", "Park", "Sunset", "Ridge", "Industrial", "Commerce", "Market",
+    "Church", "Mill", "Spring", "River", "Highland", "Forest", "Airport",
+]
+STREET_TYPES = {
+    "Street": "St",
+    "Avenue": "Ave",
+    "Road": "Rd",
+    "Boulevard": "Blvd",
+    "Drive": "Dr",
+    "Lane": "Ln",
+    "Parkway": "Pkwy",
+    "Court": "Ct",
+}
+LOCATIONS = [
+    ("Austin", "TX", "78701"),
+    ("Boston", "MA", "02108"),
+    ("Chicago", "IL", "60601"),
+    ("Denver", "CO", "80202"),
+    ("Houston", "TX", "77002"),
+    ("Miami", "FL", "33130"),
+    ("Nashville", "TN", "37203"),
+    ("Phoenix", "AZ", "85004"),
+    ("Portland", "OR", "97204"),
+    ("Seattle", "WA", "98101"),
+    ("San Diego", "CA", "92101"),
+    ("Atlanta", "GA", "30303"),
+]
+PAYMENT_TERMS = ["NET_30", "NET_45", "NET_60", "DUE_ON_RECEIPT"]
+
+
+def _company_name(rng):
+    name = f"{rng.choice(NAME_WORDS)} {rng.choice(INDUSTRY_WORDS)}"
+    suffix = rng.choice(SUFFIXES)
+    return f"{name} {suffix}" if suffix else name
+
+
+def _street(rng):
+    street_type = rng.choice(list(STREET_TYPES))
+    if rng.random() < 0.5:
+        street_type = STREET_TYPES[street_type]
+    return f"{rng.randint(1, 9999)} {rng.choice(STREET_NAMES)} {street_type}"
+
+
+def _profile(rng, index, street, location):
+    """A D&B Connect profile as the Bulk API nests it under the Account."""
+    city, state, postal = location
+    profile = {
+        "attributes": {
+            "type": "DNBConnect__D_B_Connect_Company_Profile__c",
+            "url": f"/services/data/v59.0/sobjects/DNBConnect__D_B_Connect_Company_Profile__c/a0D{index:015d}",
+        }
+    }
+    primary = [street, city, state, postal, "United States"]
+    if rng.random() < 0.5:
+        mailing = [_street(rng), city, state, postal, "United States"]
+    else:
+        mailing = [None] * len(MAILING_COLUMNS)
+    profile.update(zip(PRIMARY_COLUMNS, primary))
+    profile.update(zip(MAILING_COLUMNS, mailing))
+    return profile
+
+
+def make_accounts(n, seed=0, profile_rate=0.6, missing_street_rate=0.05):
+    """
+    Return `n` Account records shaped like the rows `sf.bulk.Account.query`
+    yields for the Fetch Data query, including the nested D&B profile.
+
+    At least one record with and one without a profile is always produced
+    (when n >= 2) so the flattening step sees both column shapes.
+    """
+    rng = random.Random(seed)
+    records = []
+    for index in range(n):
+        location = rng.choice(LOCATIONS)
+        city, state, postal = location
+        street = _street(rng)
+        if index == 0:
+            has_profile = True
+        elif index == 1:
+            has_profile = False
+        else:
+            has_profile = rng.random() < profile_rate
+        record = {
+            "attributes": {
+                "type": "Account",
+                "url": f"/services/data/v59.0/sobjects/Account/001{index:015d}",
+            },
+            "Id": f"001{index:015d}",
+            "Enterprise_ID__c": f"E{index:08d}",
+            "Name": _company_name(rng),
+            "BillingStreet": street if rng.random() >= missing_street_rate else None,
+            "BillingCity": city,
+            "BillingState": state,
+            "BillingPostalCode": postal,
+            "BillingCountry": "United States",
+            PROFILE_KEY: (
+                _profile(rng, index, street, location) if has_profile else None
+            ),
+        }
+        records.append(record)
+    return records
+
+
+def _typo(rng, text):
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 2)
+    if rng.random() < 0.5:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+    return text[:i] + text[i + 1 :]
+
+
+def noisy_street(rng, street, noise):
+    """Perturb a street the way hand-keyed acquisition data tends to differ."""
+    for long_form, short_form in STREET_TYPES.items():
+        if rng.random() < noise:
+            if street.endswith(" " + long_form):
+                street = street[: -len(long_form)] + short_form
+            elif street.endswith(" " + short_form):
+                street = street[: -len(short_form)] + long_form
+    if rng.random() < noise:
+        street = street.upper()
+    if rng.random() < noise / 2:
+        street = _typo(rng, street)
+    return street
+
+
+def noisy_name(rng, name, noise):
+    parts = name.rsplit(" ", 1)
+    if len(parts) == 2 and parts[1] in SUFFIX_VARIANTS and rng.random() < noise:
+        name = f"{parts[0]} {rng.choice(SUFFIX_VARIANTS[parts[1]])}"
+    if rng.random() < noise:
+        name = name.upper()
+    if rng.random() < noise / 2:
+        name = _typo(rng, name)
+    return name
+
+
+def make_acquisition(n, accounts, duplicate_rate=0.2, noise=0.3, seed=0):
+    """
+    Return `(acquisition_df, labels_df)`.
+
+    `acquisition_df` has the columns of the Acquisition Template. A
+    `duplicate_rate` share of its rows are noisy copies of records from
+    `accounts`; `labels_df` lists those as "Legacy Customer ID" -> "Id".
+    """
+    rng = random.Random(seed + 1)
+    candidates = [r for r in accounts if r["BillingStreet"]]
+    rows = []
+    labels = []
+    for index in range(n):
+        legacy_id = f"L{index:08d}"
+        location = rng.choice(LOCATIONS)
+        if candidates and rng.random() < duplicate_rate:
+            source = rng.choice(candidates)
+            name = noisy_name(rng, source["Name"], noise)
+            street = noisy_street(rng, source["BillingStreet"], noise)
+            location = (
+                source["BillingCity"],
+                source["BillingState"],
+                source["BillingPostalCode"],
+            )
+            labels.append((legacy_id, source["Id"]))
+        else:
+            name = _company_name(rng)
+            street = _street(rng)
+        city, state, postal = location
+        if rng.random() < noise / 2:
+            line_2 = f"Attn: {rng.choice(['Accounts Payable', 'AP Dept', 'Billing'])}"
+        elif rng.random() < noise / 2:
+            line_2 = f"Suite {rng.randint(100, 999)}"
+        else:
+            line_2 = None
+        rows.append(
+            [
+                legacy_id,
+                rng.choice(PAYMENT_TERMS),
+                name,
+                street,
+                line_2,
+                city,
+                state,
+                postal,
+                "United States",
+                f"{rng.randint(10, 99)}-{rng.randint(1000000, 9999999)}",
+            ]
+        )
+    acquisition = pd.DataFrame(rows, columns=ACQUISITION_COLUMNS)
+    return acquisition, pd.DataFrame(labels, columns=["Legacy Customer ID", "Id"])
@@ -0,0 +1,271 @@
+import cProfile
+import json
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter, strftime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stage timings, throttled progress and opt-in profilers for a duplicate
+# check run. Nothing here depends on Streamlit.
+
+
+def process_peak_rss_mb():
+    """
+    High-water mark of this process's resident set size, in MB. It only
+    ever grows, so in a long-running server it is not a per-stage figure.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+# tracemalloc is process-wide: it runs while any traced stage is open and its
+# peak is shared, so stages that overlap (e.g. two Streamlit sessions) are
+# flagged rather than trusted.
+_trace_lock = threading.Lock()
+_traced_stages = 0
+_traced_starts = 0
+_started_tracing = False
+
+
+def _start_tracing():
+    """
+    Returns whether another traced stage is already running, and a count of
+    traced stage starts to compare against when the stage ends.
+    """
+    global _traced_stages, _traced_starts, _started_tracing
+    with _trace_lock:
+        overlapping = _traced_stages > 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        tracemalloc.reset_peak()
+        _traced_stages += 1
+        _traced_starts += 1
+        return overlapping, _traced_starts
+
+
+def _stop_tracing():
+    """
+    Returns the traced peak in MB and the current start count. Stops
+    tracemalloc when the last traced stage ends, unless it was already on.
+    """
+    global _traced_stages, _started_tracing
+    with _trace_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _traced_stages -= 1
+        if _traced_stages == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return round(peak / (1024 * 1024), 1), _traced_starts
+
+
+class RunMetrics:
+    """
+    Collects one record per named stage, each stamped with when it started.
+    Re-running a stage replaces its record.
+
+    Every stage records how much it raised the process's peak RSS. With
+    `trace_memory` on, it also records the peak memory Python allocated while
+    it ran, via tracemalloc. This slows the stage down, and tracing stops
+    again once no traced stage is running.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.started = strftime("%Y-%m-%d %H:%M:%S")
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time the enclosed block. The yielded dict can be filled in with
+        `rows_out` and `pairs` before the block ends. If the block raises,
+        the record gets an `error` with the exception type and the exception
+        is re-raised.
+        """
+        record = {
+            "started": strftime("%Y-%m-%d %H:%M:%S"),
+            "rows_in": rows_in,
+            "rows_out": None,
+        }
+        tracing = self.trace_memory
+        if tracing:
+            overlapping, starts = _start_tracing()
+        rss_before = process_peak_rss_mb()
+        start = perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            seconds = perf_counter() - start
+            record["seconds"] = round(seconds, 4)
+            if record.get("pairs") is not None:
+                record["pairs_per_sec"] = (
+                    round(record["pairs"] / seconds) if seconds else None
+                )
+            if tracing:
+                record["peak_traced_mb"], starts_after = _stop_tracing()
+                if overlapping or starts_after != starts:
+                    record["peak_traced_shared"] = True
+            rss_after = process_peak_rss_mb()
+            if rss_after is not None:
+                record["rss_growth_mb"] = round(rss_after - rss_before, 1)
+            record["process_peak_rss_mb"] = rss_after
+            self.stages[name] = record
+
+    def rows(self):
+        """
+        One flat dict per stage, in the order the stages first ran. `error` is
+        always present so failed stages stand out in a table.
+        """
+        return [
+            {"stage": name, "error": None, **record}
+            for name, record in self.stages.items()
+        ]
+
+    def to_dict(self, inputs=None):
+        """
+        `inputs` is another RunMetrics whose stages produced this run's
+        inputs, e.g. the fetch and preprocessing done on earlier reruns.
+        """
+        summary = {"started": self.started, "stages": self.stages}
+        if inputs is not None:
+            summary["input_stages"] = inputs.stages
+        return summary
+
+    def save(self, path, inputs=None):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(inputs), f, indent=2)
+        return path
+
+
+class ThrottledProgress:
+    """
+    Wraps an `on_progress(done, total)` callback so it fires at most once per
+    `interval` seconds, plus always on the final update.
+    """
+
+    def __init__(self, callback, interval=0.5):
+        self.callback = callback
+        self.interval = interval
+        self.last = None
+
+    def __call__(self, done, total):
+        now = perf_counter()
+        if done >= total or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            self.callback(done, total)
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the thread that started it every `interval` seconds
+    and writes the counts in collapsed-stack format ("a;b;c 12" per line),
+    which flamegraph tools read directly.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            if self._paused.is_set():
+                continue
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+PROFILERS = ["Off", "cProfile", "Sampling"]
+
+
+class ProfileHandle:
+    """Yielded by `profiled`; `paused()` leaves a block out of the profile."""
+
+    def __init__(self, pause=None, resume=None):
+        self._pause = pause
+        self._resume = resume
+
+    @contextmanager
+    def paused(self):
+        if self._pause is None:
+            yield
+            return
+        self._pause()
+        try:
+            yield
+        finally:
+            self._resume()
+
+
+@contextmanager
+def profiled(mode, path):
+    """
+    Profile the enclosed block with `mode` ("cProfile" or "Sampling") and
+    save the result to `path`. Any other mode runs the block unprofiled.
+    Yields a ProfileHandle for leaving idle parts, such as sleeps, out.
+    """
+    if mode == "cProfile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield ProfileHandle(profiler.disable, profiler.enable)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    elif mode == "Sampling":
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            yield ProfileHandle(profiler.pause, profiler.resume)
+        finally:
+            profiler.stop()
+            profiler.dump(path)
+    else:
+        yield ProfileHandle()
@@ -4,9 +4,19 @@ import os
 from simple_salesforce import Salesforce
 from google.cloud import secretmanager
 import json
-import jellyfish
 from time import sleep, strftime
 
+from pipeline import (
+    ACQUISITION_COLUMNS,
+    build_output,
+    clean_results,
+    compare,
+    fetch_accounts,
+    flatten_accounts,
+    preprocess_acquisition,
+)
+from instrumentation import PROFILERS, RunMetrics, ThrottledProgress, profiled
+
 # Define a temporary folder for storing uploaded and generated files
 TEMP_FOLDER = "temp"
 os.makedirs(TEMP_FOLDER, exist_ok=True)
@@ -15,6 +25,20 @@ timestr = strftime("%Y%m%d_%H%M%S_")
 # Streamlit UI
 st.title("Salesforce Acquisition Duplicate Processing Tool")
 
+# Timings of the stages that prepare the inputs (upload, login, fetch), kept
+# across reruns. Each Clean and Compare run records its own stages separately.
+if "metrics" not in st.session_state:
+    st.session_state.metrics = RunMetrics()
+metrics = st.session_state.metrics
+
+with st.expander("⚙️ Diagnostics"):
+    metrics.trace_memory = st.checkbox(
+        "Track memory per stage (slower)", key="TraceMemory"
+    )
+    profiler_mode = st.selectbox(
+        "Profile the Clean and Compare run", PROFILERS, key="Profiler"
+    )
+
 # Key uploader
 Key_file = st.file_uploader("📂 Upload Key File", type=["json"])
 
@@ -30,21 +54,10 @@ if Key_file:
 
 # Function to generate the template Excel file
 def generate_excel():
-    Acquisition_Column_List = [
-        "Legacy Customer ID",
-        "Payment Terms",
-        "Account Name",
-        "Billing Street",
-        "Billing Address Line 2",
-        "Billing City",
-        "Billing State/Province",
-        "Billing Zip/Postal Code",
-        "Billing Country",
-        "Tax ID",
-    ]
-    Acquisition_Template = pd.DataFrame(columns=Acquisition_Column_List)
+    Acquisition_Template = pd.DataFrame(columns=ACQUISITION_COLUMNS)
     filepath = os.path.join(TEMP_FOLDER, "Acquisition_Template.xlsx")
-    Acquisition_Template.to_excel(filepath, index=False)
+    with metrics.stage("write_template"):
+        Acquisition_Template.to_excel(filepath, index=False)
     return filepath
 
 
@@ -79,7 +92,9 @@ if acquisition_file:
     st.write("🔄 Processing Acquisition file...")
 
     # Read and preprocess the acquisition file
-    Acquisition_Data = pd.read_excel(acquisition_path)
+    with metrics.stage("read_acquisition") as stage:
+        Acquisition_Data = pd.read_excel(acquisition_path)
+        stage["rows_out"] = len(Acquisition_Data)
 
     # Ensure necessary columns exist
     required_columns = ["Billing Street", "Billing Address Line 2"]
@@ -89,16 +104,14 @@ if acquisition_file:
             st.stop()
 
     # Apply preprocessing steps automatically
-    Copy_Acquisition_Data = Acquisition_Data[required_columns].replace(
-        r"(?i)Att.*$", "", regex=True
-    )
-    Acquisition_Data["FullAddress"] = Copy_Acquisition_Data.apply(
-        lambda x: "\n".join(x.dropna().astype(str)), axis=1
-    )
+    with metrics.stage("preprocess", len(Acquisition_Data)) as stage:
+        Acquisition_Data = preprocess_acquisition(Acquisition_Data)
+        stage["rows_out"] = len(Acquisition_Data)
 
     # Save the preprocessed file in the temp folder
     processed_acquisition_path = os.path.join(TEMP_FOLDER, "processed_acquisition.xlsx")
-    Acquisition_Data.to_excel(processed_acquisition_path, index=False)
+    with metrics.stage("write_processed_acquisition", len(Acquisition_Data)):
+        Acquisition_Data.to_excel(processed_acquisition_path, index=False)
 
     st.success("✅ Acquisition file preprocessed and ready for further processing!")
     st.download_button(
@@ -133,7 +146,8 @@ SF_Password = st.text_input("🔄 Salesforce Password", type="password")
 if st.button("🔐 Login"):
     try:
         # Retrieve secrets from Google Cloud
-        secrets = get_secret("Salesforce_Key", "selesforce-455620")
+        with metrics.stage("secret_retrieval"):
+            secrets = get_secret("Salesforce_Key", "selesforce-455620")
 
         # Get credentials for the selected environment
         env_data = secrets.get(environment, {})
@@ -146,13 +160,14 @@ if st.button("🔐 Login"):
             st.error(f"⚠️ Missing credentials for {environment}")
         else:
             # Authenticate with Salesforce
-            st.session_state.sf = Salesforce(
-                username=SF_UserName,
-                instance_url=URL,
-                password=SF_Password,
-                consumer_key=KEY,
-                consumer_secret=SECRET,
-            )
+            with metrics.stage("login"):
+                st.session_state.sf = Salesforce(
+                    username=SF_UserName,
+                    instance_url=URL,
+                    password=SF_Password,
+                    consumer_key=KEY,
+                    consumer_secret=SECRET,
+                )
             st.success(f"✅ Successfully authenticated to {environment}!")
     except Exception as e:
         st.error(f"❌ Authentication failed: {str(e)}")
@@ -167,61 +182,15 @@ def fetch_and_clean_results(Currency):
 
     sf = st.session_state.sf  # Retrieve the stored Salesforce session
 
-    query = f"""
-        SELECT 
-            Id, Enterprise_ID__c, Name, BillingStreet, BillingCity, BillingState, 
-            BillingPostalCode, BillingCountry,
-            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_streetAddr_line1__c,
-            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_AddrLocal_name__c,
-            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_Region_name__c, 
-            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_postalCode__c, 
-            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_Cntry_name__c, 
-            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_streetAddr_line1__c,
-            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_AddrLocal_name__c, 
-            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_Region_name__c,
-            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_postalCode__c, 
-            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_Cntry_name__c
-        FROM Account
-        WHERE RecordType.Name IN ('Customer', 'Prospect') 
-        AND CurrencyIsoCode = '{Currency}'
-    """
-
     try:
-        fetch_results = getattr(sf.bulk, "Account").query(query, lazy_operation=True)
+        with metrics.stage("fetch") as stage:
+            stage["currency"] = Currency
+            all_results = fetch_accounts(sf, Currency)
+            stage["rows_out"] = len(all_results)
         # Process and clean the results
-
-        all_results = []
-        for list_results in fetch_results:
-            all_results.extend(list_results)
-
-        def remove_attributes_keys(d):
-            """
-            Recursively remove keys that contain 'attributes_url' or 'attributes_type'.
-            Also unpacks 'DNBConnect__D_B_Connect_Company_Profile__r' into its own columns.
-            """
-            if isinstance(d, dict):
-                cleaned_dict = {}
-                for k, v in d.items():
-                    # Remove keys that contain 'attributes'
-                    if "attributes" not in k:
-                        if (
-                            isinstance(v, dict)
-                            and "DNBConnect__D_B_Connect_Company_Profile__r" in k
-                        ):
-                            # If value is a dict (nested), unpack its keys into the parent dictionary
-                            for nested_k, nested_v in v.items():
-                                cleaned_dict[nested_k] = nested_v
-                        else:
-                            # Otherwise, just add the key-value pair
-                            cleaned_dict[k] = remove_attributes_keys(v)
-                return cleaned_dict
-            elif isinstance(d, list):
-                return [remove_attributes_keys(i) for i in d]
-            else:
-                return d
-
-        # Apply the cleaning function to the results
-        cleaned_results = [remove_attributes_keys(result) for result in all_results]
+        with metrics.stage("clean", len(all_results)) as stage:
+            cleaned_results = clean_results(all_results)
+            stage["rows_out"] = len(cleaned_results)
         return cleaned_results
     except Exception as e:
         st.error(f"❌ Failed to fetch data: {str(e)}")
@@ -261,68 +230,18 @@ if "sf" in st.session_state:
         results = fetch_and_clean_results(Currency)
 
         if results:
-            # Convert to a Dataframe
-            df = pd.DataFrame(results)
-            # Remove unneeded columns
-            df = df.drop(
-                columns=["attributes", "DNBConnect__D_B_Connect_Company_Profile__r"]
-            )
-            Formatted_Salesforce_df = df[df["BillingStreet"].notnull()]
-            Formatted_Salesforce_df = Formatted_Salesforce_df.drop(
-                columns=[
-                    "primAddr_streetAddr_line1__c",
-                    "primAddr_AddrLocal_name__c",
-                    "primAddr_Region_name__c",
-                    "primAddr_postalCode__c",
-                    "primAddr_Cntry_name__c",
-                    "mailingAddr_streetAddr_line1__c",
-                    "mailingAddr_AddrLocal_name__c",
-                    "mailingAddr_Region_name__c",
-                    "mailingAddr_postalCode__c",
-                    "mailingAddr_Cntry_name__c",
-                ]
-            )
-            filtered_rows_Primary = df[df["primAddr_streetAddr_line1__c"].notnull()]
-            filtered_rows_Primary = filtered_rows_Primary.drop(
-                columns=[
-                    "BillingStreet",
-                    "BillingCity",
-                    "BillingState",
-                    "BillingPostalCode",
-                    "BillingCountry",
-                    "mailingAddr_streetAddr_line1__c",
-                    "mailingAddr_AddrLocal_name__c",
-                    "mailingAddr_Region_name__c",
-                    "mailingAddr_postalCode__c",
-                    "mailingAddr_Cntry_name__c",
-                ]
-            )
-            filtered_rows_Mailing = df[df["mailingAddr_streetAddr_line1__c"].notnull()]
-            filtered_rows_Mailing = filtered_rows_Mailing.drop(
-                columns=[
-                    "BillingStreet",
-                    "BillingCity",
-                    "BillingState",
-                    "BillingPostalCode",
-                    "BillingCountry",
-                    "primAddr_streetAddr_line1__c",
-                    "primAddr_AddrLocal_name__c",
-                    "primAddr_Region_name__c",
-                    "primAddr_postalCode__c",
-                    "primAddr_Cntry_name__c",
-                ]
-            )
-            filtered_rows_Mailing.columns = Formatted_Salesforce_df.columns
-            filtered_rows_Primary.columns = Formatted_Salesforce_df.columns
-            st.session_state.salesforce_file = pd.concat(
-                [Formatted_Salesforce_df, filtered_rows_Primary, filtered_rows_Mailing]
-            )
+            with metrics.stage("flatten", len(results)) as stage:
+                st.session_state.salesforce_file = flatten_accounts(results)
+                stage["rows_out"] = len(st.session_state.salesforce_file)
             processed_Salesforce_path = os.path.join(
                 TEMP_FOLDER, "processed_Salesforce.xlsx"
             )
-            st.session_state.salesforce_file.to_excel(
-                processed_Salesforce_path, index=False
-            )
+            with metrics.stage(
+                "write_processed_salesforce", len(st.session_state.salesforce_file)
+            ):
+                st.session_state.salesforce_file.to_excel(
+                    processed_Salesforce_path, index=False
+                )
             st.success("✅ Salesforce data cleaned and stored!")
             st.download_button(
                 label="📥 Download Processed Salesforce File",
@@ -377,112 +296,37 @@ if "sf" in st.session_state:  # Only show if user is logged in
         key="CurrencyAccount",
     )
 
-    def Compare(Acquisition_File, Salesforce_File, Address_Ratio_Int, Name_Ratio_Int):
+    def Compare(
+        Acquisition_File,
+        Salesforce_File,
+        Address_Ratio_Int,
+        Name_Ratio_Int,
+        run_metrics,
+    ):
         st.write("Starting Comparison")
-        final_Colum = [
-            "SF AccountID",
-            "Legacy Customer ID",
-            "Enterprise ID",
-            "Account Name",
-            "Full Address",
-            "Billing City",
-            "Billing State",
-            "Postal Code",
-            "Country",
-            "Score",
-        ]
-        st.session_state.final = pd.DataFrame(columns=final_Colum)
-        Copy_Formatted_Salesforce_df = Salesforce_File
-        Acquisition_Data = Acquisition_File
-        Enterprise_ID = len(Acquisition_Data["FullAddress"])
         # Initialize UI elements
         progress_bar = st.progress(0)
         status_text = st.empty()  # To display real-time status updates
-        for index, column in enumerate(Acquisition_Data["FullAddress"]):
-            progress = int((index + 1) / Enterprise_ID * 100)  # Calculate percentage
+
+        def show_progress(done, total):
+            progress = int(done / total * 100)  # Calculate percentage
             progress_bar.progress(progress)  # Update progress bar
-            status_text.text(
-                f"📊 Progress: {index+1}/{Enterprise_ID}"
-            )  # Show progress text
-            for Salesforce_File_Index, Salesforce_File_Value in enumerate(
-                Copy_Formatted_Salesforce_df["BillingStreet"]
-            ):
-                score = jellyfish.jaro_winkler_similarity(
-                    (str(column).lower()), (str(Salesforce_File_Value).lower())
-                )
-                scorer = int(score * 100) >= int(Address_Ratio_Int)
-                if scorer:
-                    sName = str(
-                        Copy_Formatted_Salesforce_df["Name"].iloc[
-                            int(Salesforce_File_Index)
-                        ]
-                    )
-                    aName = str(Acquisition_Data["Account Name"].iloc[int(index)])
-                    nScore = jellyfish.jaro_winkler_similarity(
-                        (sName.lower()), (aName.lower())
-                    )
-                    nScorer = int(nScore * 100) >= int(Name_Ratio_Int)
-                    if nScorer:
-                        st.session_state.final.loc[
-                            len(st.session_state.final.index)
-                        ] = [
-                            "",
-                            Acquisition_Data["Legacy Customer ID"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            "",
-                            Acquisition_Data["Account Name"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            Acquisition_Data["FullAddress"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            Acquisition_Data["Billing City"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            Acquisition_Data["Billing State/Province"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            Acquisition_Data["Billing Zip/Postal Code"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            Acquisition_Data["Billing Country"]
-                            .astype(str)
-                            .iloc[int(index)],
-                            "",
-                        ]
-                        st.session_state.final.loc[
-                            len(st.session_state.final.index)
-                        ] = [
-                            Copy_Formatted_Salesforce_df["Id"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            "",
-                            Copy_Formatted_Salesforce_df["Enterprise_ID__c"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["Name"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["BillingStreet"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["BillingCity"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["BillingState"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["BillingPostalCode"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            Copy_Formatted_Salesforce_df["BillingCountry"]
-                            .astype(str)
-                            .iloc[int(Salesforce_File_Index)],
-                            score,
-                        ]
+            status_text.text(f"📊 Progress: {done}/{total}")  # Show progress text
+
+        with run_metrics.stage("compare", len(Acquisition_File)) as stage:
+            stage["pairs"] = len(Acquisition_File) * len(Salesforce_File)
+            st.session_state.final = compare(
+                Acquisition_File,
+                Salesforce_File,
+                Address_Ratio_Int,
+                Name_Ratio_Int,
+                # Redrawing the widgets after every row is itself a real cost
+                on_progress=ThrottledProgress(show_progress),
+            )
+            stage["rows_out"] = len(st.session_state.final)
         processed_Compared_path = os.path.join(TEMP_FOLDER, "Matching_Accounts.xlsx")
-        st.session_state.final.to_excel(processed_Compared_path, index=False)
+        with run_metrics.stage("write_matches", len(st.session_state.final)):
+            st.session_state.final.to_excel(processed_Compared_path, index=False)
         status_text.text("✅ Processing Complete!")
         st.success("All records processed successfully!")
         st.download_button(
@@ -498,197 +342,19 @@ if "sf" in st.session_state:  # Only show if user is logged in
         Currency,
         Term,
         pros,
+        run_metrics,
     ):
         st.write("Building a File of De-Duplicated Accounts")
-        outputs_colum = [
-            "_Legacy Customer ID",
-            "Name",
-            "RecordTypeId",
-            "Customer_Status__c",
-            "Customer_Status_Assigned__c",
-            "CurrencyIsoCode",
-            "Payment_Terms__c",
-            "Customer_Group__c",
-            "Customer_Category__c",
-            "WDIntegrate__c",
-            "PublishToWorkday__c",
-            "BillingStreet",
-            "BillingCity",
-            "BillingState",
-            "BillingPostalCode",
-            "BillingCountry",
-            "Tax ID",
-        ]
-        outputs = pd.DataFrame(columns=outputs_colum)
-        Found = st.session_state.final
-        Copy_Acquisition_File = Acquisition_File
-        if pros is True:
-            Sf_Record_ID_Type = "012a00000018GZk"
-            Workday = "n"
-            Publish = "n"
-            SF_Customer_Status = "Inactive"
-            SF_Status = "Prospect"
-        else:
-            Sf_Record_ID_Type = "012a00000018GZgAAM"
-            Workday = "y"
-            Publish = "y"
-            SF_Customer_Status = "Active"
-            SF_Status = "Customer"
-        for index, column in enumerate(Copy_Acquisition_File["Account Name"]):
-            Index_Check = column in Found["Account Name"].values
-            if Index_Check:
-                continue
-            else:
-                payment_terms = (
-                    Copy_Acquisition_File["Payment Terms"].astype(str).iloc[int(index)]
-                    if Term is True
-                    else "NET_30"
-                )
-                if str(column).startswith(
-                    (
-                        "A",
-                        "B",
-                        "C",
-                        "D",
-                        "E",
-                        "F",
-                        "G",
-                        "H",
-                        "I",
-                        "J",
-                        "K",
-                        "L",
-                        "M",
-                        "a",
-                        "b",
-                        "c",
-                        "d",
-                        "e",
-                        "f",
-                        "g",
-                        "h",
-                        "i",
-                        "j",
-                        "k",
-                        "l",
-                        "m",
-                        "1",
-                        "2",
-                        "3",
-                        "4",
-                        "5",
-                        "6",
-                        "7",
-                        "8",
-                        "9",
-                        "0",
-                        "(",
-                        "Đ",
-                        "Ô",
-                    )
-                ):
-                    cgroup = "Statement_A-M"
-                    outputs.loc[len(outputs.index)] = [
-                        Copy_Acquisition_File["Legacy Customer ID"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Account Name"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Sf_Record_ID_Type,
-                        SF_Customer_Status,
-                        SF_Status,
-                        Currency,
-                        payment_terms,
-                        cgroup,
-                        "Trade",
-                        Workday,
-                        Publish,
-                        Copy_Acquisition_File["FullAddress"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing City"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing State/Province"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing Zip/Postal Code"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing Country"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Tax ID"].astype(str).iloc[int(index)],
-                    ]
-                elif str(column).startswith(
-                    (
-                        "N",
-                        "O",
-                        "P",
-                        "Q",
-                        "R",
-                        "S",
-                        "T",
-                        "U",
-                        "V",
-                        "W",
-                        "X",
-                        "Y",
-                        "Z",
-                        "n",
-                        "o",
-                        "p",
-                        "q",
-                        "r",
-                        "s",
-                        "t",
-                        "u",
-                        "v",
-                        "w",
-                        "x",
-                        "y",
-                        "z",
-                    )
-                ):
-                    cgroup = "Statement_N-Z"
-                    outputs.loc[len(outputs.index)] = [
-                        Copy_Acquisition_File["Legacy Customer ID"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Account Name"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Sf_Record_ID_Type,
-                        SF_Customer_Status,
-                        SF_Status,
-                        Currency,
-                        payment_terms,
-                        cgroup,
-                        "Trade",
-                        Workday,
-                        Publish,
-                        Copy_Acquisition_File["FullAddress"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing City"]
-                        .str.title()
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing State/Province"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing Zip/Postal Code"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Billing Country"]
-                        .astype(str)
-                        .iloc[int(index)],
-                        Copy_Acquisition_File["Tax ID"].astype(str).iloc[int(index)],
-                    ]
+        with run_metrics.stage("output", len(Acquisition_File)) as stage:
+            outputs = build_output(
+                Acquisition_File, st.session_state.final, Currency, Term, pros
+            )
+            stage["rows_out"] = len(outputs)
         processed_dataload_path = os.path.join(
             TEMP_FOLDER, "New_Accounts_Dataload.xlsx"
         )
-        outputs.to_excel(processed_dataload_path, index=False)
+        with run_metrics.stage("write_dataload", len(outputs)):
+            outputs.to_excel(processed_dataload_path, index=False)
         st.success("File successfully Created!")
         st.download_button(
             label="📥 Download New Accounts Dataload file ",
@@ -701,22 +367,65 @@ if "sf" in st.session_state:  # Only show if user is logged in
     # Button to trigger the Clean_file function
     if st.button("🚀 Clean and Compare Files"):
         if acquisition_file and st.session_state.get("salesforce_file") is not None:
-            # Read the uploaded and preprocessed files
-            acquisition_df = pd.read_excel(processed_acquisition_path)
-
-            # Retrieve the stored Salesforce file
-            salesforce_df = st.session_state.salesforce_file
-
-            Compare(
-                acquisition_df,
-                salesforce_df,
-                address_ratio_int,
-                name_ratio_int,
+            profile_name = (
+                "Compare_Profile.prof"
+                if profiler_mode == "cProfile"
+                else "Compare_Profile.txt"
             )
+            profile_path = os.path.join(TEMP_FOLDER, profile_name)
+            run_metrics = RunMetrics(trace_memory=metrics.trace_memory)
+            with profiled(profiler_mode, profile_path) as profile:
+                # Read the uploaded and preprocessed files
+                with run_metrics.stage("read_processed_acquisition") as stage:
+                    acquisition_df = pd.read_excel(processed_acquisition_path)
+                    stage["rows_out"] = len(acquisition_df)
+
+                # Retrieve the stored Salesforce file
+                salesforce_df = st.session_state.salesforce_file
+
+                Compare(
+                    acquisition_df,
+                    salesforce_df,
+                    address_ratio_int,
+                    name_ratio_int,
+                    run_metrics,
+                )
 
-            sleep(3)
+                # Idle pause between the two steps, kept out of the profile
+                with profile.paused():
+                    sleep(3)
 
-            Output(acquisition_df, CurrencyISO, PaymentTerms, RecordType)
+                Output(
+                    acquisition_df,
+                    CurrencyISO,
+                    PaymentTerms,
+                    RecordType,
+                    run_metrics,
+                )
+
+            # Summarise where the time went and keep a copy of the numbers
+            st.subheader("📈 Run Metrics")
+            st.dataframe(pd.DataFrame(run_metrics.rows()))
+            st.caption("Input stages, from earlier steps of this session")
+            st.dataframe(pd.DataFrame(metrics.rows()))
+            metrics_path = run_metrics.save(
+                os.path.join(TEMP_FOLDER, "Run_Metrics.json"), inputs=metrics
+            )
+            st.download_button(
+                label="📥 Download Run Metrics",
+                data=open(metrics_path, "rb").read(),
+                file_name=timestr + "Run_Metrics.json",
+                mime="application/json",
+                on_click="ignore",
+            )
+            if profiler_mode != "Off":
+                st.download_button(
+                    label="📥 Download Profile",
+                    data=open(profile_path, "rb").read(),
+                    file_name=timestr + profile_name,
+                    mime="application/octet-stream",
+                    on_click="ignore",
+                )
         else:
             st.warning("⚠️ Please provide Acquisition File.")
 else:
@@ -0,0 +1,389 @@
+import pandas as pd
+import jellyfish
+
+# Core data steps of the duplicate check, kept free of Streamlit so they can be
+# driven from the app, the benchmarks, or a plain Python session.
+
+ACQUISITION_COLUMNS = [
+    "Legacy Customer ID",
+    "Payment Terms",
+    "Account Name",
+    "Billing Street",
+    "Billing Address Line 2",
+    "Billing City",
+    "Billing State/Province",
+    "Billing Zip/Postal Code",
+    "Billing Country",
+    "Tax ID",
+]
+
+ADDRESS_COLUMNS = ["Billing Street", "Billing Address Line 2"]
+
+ACCOUNT_QUERY = """
+        SELECT
+            Id, Enterprise_ID__c, Name, BillingStreet, BillingCity, BillingState,
+            BillingPostalCode, BillingCountry,
+            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_streetAddr_line1__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_AddrLocal_name__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_Region_name__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_postalCode__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.primAddr_Cntry_name__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_streetAddr_line1__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_AddrLocal_name__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_Region_name__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_postalCode__c,
+            DNBConnect__D_B_Connect_Company_Profile__r.mailingAddr_Cntry_name__c
+        FROM Account
+        WHERE RecordType.Name IN ('Customer', 'Prospect')
+        AND CurrencyIsoCode = '{Currency}'
+    """
+
+BILLING_COLUMNS = [
+    "BillingStreet",
+    "BillingCity",
+    "BillingState",
+    "BillingPostalCode",
+    "BillingCountry",
+]
+PRIMARY_COLUMNS = [
+    "primAddr_streetAddr_line1__c",
+    "primAddr_AddrLocal_name__c",
+    "primAddr_Region_name__c",
+    "primAddr_postalCode__c",
+    "primAddr_Cntry_name__c",
+]
+MAILING_COLUMNS = [
+    "mailingAddr_streetAddr_line1__c",
+    "mailingAddr_AddrLocal_name__c",
+    "mailingAddr_Region_name__c",
+    "mailingAddr_postalCode__c",
+    "mailingAddr_Cntry_name__c",
+]
+
+MATCH_COLUMNS = [
+    "SF AccountID",
+    "Legacy Customer ID",
+    "Enterprise ID",
+    "Account Name",
+    "Full Address",
+    "Billing City",
+    "Billing State",
+    "Postal Code",
+    "Country",
+    "Score",
+]
+
+DATALOAD_COLUMNS = [
+    "_Legacy Customer ID",
+    "Name",
+    "RecordTypeId",
+    "Customer_Status__c",
+    "Customer_Status_Assigned__c",
+    "CurrencyIsoCode",
+    "Payment_Terms__c",
+    "Customer_Group__c",
+    "Customer_Category__c",
+    "WDIntegrate__c",
+    "PublishToWorkday__c",
+    "BillingStreet",
+    "BillingCity",
+    "BillingState",
+    "BillingPostalCode",
+    "BillingCountry",
+    "Tax ID",
+]
+
+STATEMENT_A_M = (
+    "A",
+    "B",
+    "C",
+    "D",
+    "E",
+    "F",
+    "G",
+    "H",
+    "I",
+    "J",
+    "K",
+    "L",
+    "M",
+    "a",
+    "b",
+    "c",
+    "d",
+    "e",
+    "f",
+    "g",
+    "h",
+    "i",
+    "j",
+    "k",
+    "l",
+    "m",
+    "1",
+    "2",
+    "3",
+    "4",
+    "5",
+    "6",
+    "7",
+    "8",
+    "9",
+    "0",
+    "(",
+    "Đ",
+    "Ô",
+)
+STATEMENT_N_Z = (
+    "N",
+    "O",
+    "P",
+    "Q",
+    "R",
+    "S",
+    "T",
+    "U",
+    "V",
+    "W",
+    "X",
+    "Y",
+    "Z",
+    "n",
+    "o",
+    "p",
+    "q",
+    "r",
+    "s",
+    "t",
+    "u",
+    "v",
+    "w",
+    "x",
+    "y",
+    "z",
+)
+
+
+def preprocess_acquisition(Acquisition_Data):
+    """Strip attention lines and add the FullAddress column used for matching."""
+    Copy_Acquisition_Data = Acquisition_Data[ADDRESS_COLUMNS].replace(
+        r"(?i)Att.*$", "", regex=True
+    )
+    Acquisition_Data["FullAddress"] = Copy_Acquisition_Data.apply(
+        lambda x: "\n".join(x.dropna().astype(str)), axis=1
+    )
+    return Acquisition_Data
+
+
+def fetch_accounts(sf, Currency):
+    """Run the Account Bulk query and return the raw records as one list."""
+    query = ACCOUNT_QUERY.format(Currency=Currency)
+    fetch_results = getattr(sf.bulk, "Account").query(query, lazy_operation=True)
+
+    all_results = []
+    for list_results in fetch_results:
+        all_results.extend(list_results)
+    return all_results
+
+
+def remove_attributes_keys(d):
+    """
+    Recursively remove keys that contain 'attributes_url' or 'attributes_type'.
+    Also unpacks 'DNBConnect__D_B_Connect_Company_Profile__r' into its own columns.
+    """
+    if isinstance(d, dict):
+        cleaned_dict = {}
+        for k, v in d.items():
+            # Remove keys that contain 'attributes'
+            if "attributes" not in k:
+                if (
+                    isinstance(v, dict)
+                    and "DNBConnect__D_B_Connect_Company_Profile__r" in k
+                ):
+                    # If value is a dict (nested), unpack its keys into the parent dictionary
+                    for nested_k, nested_v in v.items():
+                        cleaned_dict[nested_k] = nested_v
+                else:
+                    # Otherwise, just add the key-value pair
+                    cleaned_dict[k] = remove_attributes_keys(v)
+        return cleaned_dict
+    elif isinstance(d, list):
+        return [remove_attributes_keys(i) for i in d]
+    else:
+        return d
+
+
+def clean_results(all_results):
+    """Apply remove_attributes_keys to every fetched record."""
+    return [remove_attributes_keys(result) for result in all_results]
+
+
+def flatten_accounts(results):
+    """
+    Turn cleaned Account records into one row per address: the billing
+    address, the D&B primary address and the D&B mailing address.
+    """
+    # Convert to a Dataframe
+    df = pd.DataFrame(results)
+    # Remove unneeded columns
+    df = df.drop(columns=["attributes", "DNBConnect__D_B_Connect_Company_Profile__r"])
+    Formatted_Salesforce_df = df[df["BillingStreet"].notnull()]
+    Formatted_Salesforce_df = Formatted_Salesforce_df.drop(
+        columns=PRIMARY_COLUMNS + MAILING_COLUMNS
+    )
+    filtered_rows_Primary = df[df["primAddr_streetAddr_line1__c"].notnull()]
+    filtered_rows_Primary = filtered_rows_Primary.drop(
+        columns=BILLING_COLUMNS + MAILING_COLUMNS
+    )
+    filtered_rows_Mailing = df[df["mailingAddr_streetAddr_line1__c"].notnull()]
+    filtered_rows_Mailing = filtered_rows_Mailing.drop(
+        columns=BILLING_COLUMNS + PRIMARY_COLUMNS
+    )
+    filtered_rows_Mailing.columns = Formatted_Salesforce_df.columns
+    filtered_rows_Primary.columns = Formatted_Salesforce_df.columns
+    return pd.concat(
+        [Formatted_Salesforce_df, filtered_rows_Primary, filtered_rows_Mailing]
+    )
+
+
+def compare(
+    Acquisition_Data,
+    Copy_Formatted_Salesforce_df,
+    Address_Ratio_Int,
+    Name_Ratio_Int,
+    on_progress=None,
+    similarity=jellyfish.jaro_winkler_similarity,
+):
+    """
+    Score every acquisition address against every Salesforce address and
+    return the matching pairs, acquisition row first then Salesforce row.
+    `on_progress(done, total)` is called after each acquisition row.
+    `similarity(a, b)` scores two strings from 0 to 1.
+    """
+    final = pd.DataFrame(columns=MATCH_COLUMNS)
+    Enterprise_ID = len(Acquisition_Data["FullAddress"])
+    for index, column in enumerate(Acquisition_Data["FullAddress"]):
+        if on_progress is not None:
+            on_progress(index + 1, Enterprise_ID)
+        for Salesforce_File_Index, Salesforce_File_Value in enumerate(
+            Copy_Formatted_Salesforce_df["BillingStreet"]
+        ):
+            score = similarity(
+                (str(column).lower()), (str(Salesforce_File_Value).lower())
+            )
+            scorer = int(score * 100) >= int(Address_Ratio_Int)
+            if scorer:
+                sName = str(
+                    Copy_Formatted_Salesforce_df["Name"].iloc[
+                        int(Salesforce_File_Index)
+                    ]
+                )
+                aName = str(Acquisition_Data["Account Name"].iloc[int(index)])
+                nScore = similarity((sName.lower()), (aName.lower()))
+                nScorer = int(nScore * 100) >= int(Name_Ratio_Int)
+                if nScorer:
+                    final.loc[len(final.index)] = [
+                        "",
+                        Acquisition_Data["Legacy Customer ID"]
+                        .astype(str)
+                        .iloc[int(index)],
+                        "",
+                        Acquisition_Data["Account Name"].astype(str).iloc[int(index)],
+                        Acquisition_Data["FullAddress"].astype(str).iloc[int(index)],
+                        Acquisition_Data["Billing City"].astype(str).iloc[int(index)],
+                        Acquisition_Data["Billing State/Province"]
+                        .astype(str)
+                        .iloc[int(index)],
+                        Acquisition_Data["Billing Zip/Postal Code"]
+                        .astype(str)
+                        .iloc[int(index)],
+                        Acquisition_Data["Billing Country"]
+                        .astype(str)
+                        .iloc[int(index)],
+                        "",
+                    ]
+                    final.loc[len(final.index)] = [
+                        Copy_Formatted_Salesforce_df["Id"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        "",
+                        Copy_Formatted_Salesforce_df["Enterprise_ID__c"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["Name"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["BillingStreet"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["BillingCity"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["BillingState"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["BillingPostalCode"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        Copy_Formatted_Salesforce_df["BillingCountry"]
+                        .astype(str)
+                        .iloc[int(Salesforce_File_Index)],
+                        score,
+                    ]
+    return final
+
+
+def build_output(Copy_Acquisition_File, Found, Currency, Term, pros):
+    """Build the dataload of acquisition accounts that had no match in Found."""
+    outputs = pd.DataFrame(columns=DATALOAD_COLUMNS)
+    if pros is True:
+        Sf_Record_ID_Type = "012a00000018GZk"
+        Workday = "n"
+        Publish = "n"
+        SF_Customer_Status = "Inactive"
+        SF_Status = "Prospect"
+    else:
+        Sf_Record_ID_Type = "012a00000018GZgAAM"
+        Workday = "y"
+        Publish = "y"
+        SF_Customer_Status = "Active"
+        SF_Status = "Customer"
+    for index, column in enumerate(Copy_Acquisition_File["Account Name"]):
+        Index_Check = column in Found["Account Name"].values
+        if Index_Check:
+            continue
+        if str(column).startswith(STATEMENT_A_M):
+            cgroup = "Statement_A-M"
+        elif str(column).startswith(STATEMENT_N_Z):
+            cgroup = "Statement_N-Z"
+        else:
+            continue
+        payment_terms = (
+            Copy_Acquisition_File["Payment Terms"].astype(str).iloc[int(index)]
+            if Term is True
+            else "NET_30"
+        )
+        outputs.loc[len(outputs.index)] = [
+            Copy_Acquisition_File["Legacy Customer ID"].astype(str).iloc[int(index)],
+            Copy_Acquisition_File["Account Name"].str.title().iloc[int(index)],
+            Sf_Record_ID_Type,
+            SF_Customer_Status,
+            SF_Status,
+            Currency,
+            payment_terms,
+            cgroup,
+            "Trade",
+            Workday,
+            Publish,
+            Copy_Acquisition_File["FullAddress"].str.title().iloc[int(index)],
+            Copy_Acquisition_File["Billing City"].str.title().iloc[int(index)],
+            Copy_Acquisition_File["Billing State/Province"]
+            .astype(str)
+            .iloc[int(index)],
+            Copy_Acquisition_File["Billing Zip/Postal Code"]
+            .astype(str)
+            .iloc[int(index)],
+            Copy_Acquisition_File["Billing Country"].astype(str).iloc[int(index)],
+            Copy_Acquisition_File["Tax ID"].astype(str).iloc[int(index)],
+        ]
+    return outputs